@@ -1,16 +1,157 @@
 import openai
+import asyncio
 import logging
 import os
+import time
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
+SUPPORTED_IMAGE_SIZES = ("256x256", "512x512", "1024x1024") # DALL-E supported sizes
+
+class ProfileStats:
+    """Rolling latency and error rate for one model or image size profile."""
+
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window) # True for success, False for error or timeout
+        self.last_used = None
+
+    def record(self, latency_s: float, ok: bool):
+        self.latencies.append(latency_s)
+        self.outcomes.append(ok)
+        self.last_used = time.monotonic()
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[round(percentile * (len(ordered) - 1))]
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": len(self.outcomes),
+            "error_rate": round(self.error_rate, 3),
+            "p50_s": self.latency_percentile(0.5),
+            "p90_s": self.latency_percentile(0.9),
+        }
+
 class AIProcessor:
-    def __init__(self, openai_api_key: str):
+    def __init__(
+        self,
+        openai_api_key: str,
+        chat_models: list[str] | None = None,
+        image_sizes: list[str] | None = None,
+        summary_budget_s: float = 5.0,
+        image_budget_s: float = 20.0,
+        max_error_rate: float = 0.5,
+        stats_window: int = 20,
+        recovery_after_s: float = 60.0,
+        deadline_factor: float = 2.0,
+        min_attempt_fraction: float = 0.25
+    ):
         if not openai_api_key:
             raise ValueError("OpenAI API key is required.")
         self.api_key = openai_api_key
         openai.api_key = self.api_key
 
+        self.max_error_rate = max_error_rate
+        self.stats_window = stats_window
+        self.recovery_after_s = recovery_after_s # Degraded profiles get retried after this long unused
+        self.deadline_factor = deadline_factor # A stage call, fallbacks included, is abandoned after budget * factor
+        self.min_attempt_fraction = min_attempt_fraction # No fallback is started with less than this share of the budget left
+        self.profiles = {}
+        self.budgets = {}
+        self.stats = {}
+        self.routing_log = deque(maxlen=100)
+        self.configure_routing(
+            chat_models=chat_models or ["gpt-3.5-turbo"],
+            image_sizes=image_sizes or ["256x256"],
+            summary_budget_s=summary_budget_s,
+            image_budget_s=image_budget_s
+        )
+
+    def configure_routing(self, chat_models: list[str], image_sizes: list[str], summary_budget_s: float, image_budget_s: float):
+        """Sets the ranked profiles (best first) and latency budgets. Stats of profiles that stay are kept."""
+        if not chat_models or not image_sizes:
+            raise ValueError("At least one chat model and one image size are required.")
+        unsupported = [size for size in image_sizes if size not in SUPPORTED_IMAGE_SIZES]
+        if unsupported:
+            raise ValueError(f"Unsupported image sizes {unsupported}. Supported: {', '.join(SUPPORTED_IMAGE_SIZES)}")
+        if summary_budget_s <= 0 or image_budget_s <= 0:
+            raise ValueError("Latency budgets must be positive.")
+
+        self.profiles = {"summary": list(chat_models), "image": list(image_sizes)}
+        self.budgets = {"summary": summary_budget_s, "image": image_budget_s}
+        for stage, profiles in self.profiles.items():
+            previous = self.stats.get(stage, {})
+            self.stats[stage] = {profile: previous.get(profile) or ProfileStats(self.stats_window) for profile in profiles}
+        logger.info(f"AI routing configured. Summary models: {chat_models} (budget {summary_budget_s}s), image sizes: {image_sizes} (budget {image_budget_s}s)")
+
+    def _ranked_profiles(self, stage: str) -> list[str]:
+        """Orders profiles for a call: healthy ones in configured rank, then degraded ones by health."""
+        budget = self.budgets[stage]
+        now = time.monotonic()
+        healthy, degraded = [], []
+        for profile in self.profiles[stage]:
+            stats = self.stats[stage][profile]
+            latency = stats.latency_percentile(0.9)
+            stale = stats.last_used is not None and now - stats.last_used > self.recovery_after_s
+            if stale or (stats.error_rate <= self.max_error_rate and (latency is None or latency <= budget)):
+                healthy.append(profile)
+            else:
+                degraded.append(profile)
+        degraded.sort(key=lambda p: (self.stats[stage][p].error_rate, self.stats[stage][p].latency_percentile(0.9) or 0.0))
+        return healthy + degraded
+
+    async def _route(self, stage: str, call):
+        """Runs `call(profile)` on the best profile for the stage, falling back down the ranking on errors.
+
+        All attempts share one stage deadline; each fallback only gets the time that is left.
+        """
+        budget = self.budgets[stage]
+        deadline = time.monotonic() + budget * self.deadline_factor
+        ranked = self._ranked_profiles(stage)
+        last_error = None
+        for attempt, profile in enumerate(ranked):
+            started_at = time.monotonic()
+            remaining = deadline - started_at
+            if attempt and remaining < budget * self.min_attempt_fraction:
+                logger.warning(f"{stage} ran out of time after {attempt} attempt(s); not trying {ranked[attempt:]}.")
+                break
+            try:
+                # A profile cut off by the deadline is recorded as a timeout below, like any other
+                result = await asyncio.wait_for(call(profile), timeout=remaining)
+                ok = True
+            except Exception as e: # Includes asyncio.TimeoutError
+                result, ok, last_error = None, False, e
+            latency = time.monotonic() - started_at
+            self.stats[stage][profile].record(latency, ok)
+            self.routing_log.append({"stage": stage, "profile": profile, "attempt": attempt, "latency_s": round(latency, 3), "ok": ok, "at": time.time()})
+            if ok:
+                if attempt:
+                    logger.info(f"{stage} served by fallback profile '{profile}' after {attempt} failed attempt(s).")
+                logger.debug(f"{stage} routed to '{profile}' ({latency:.2f}s, budget {self.budgets[stage]}s)")
+                return result
+            logger.warning(f"{stage} profile '{profile}' failed after {latency:.2f}s: {last_error!r}")
+        raise last_error
+
+    def get_routing_stats(self) -> dict:
+        """Returns per-profile latency/error stats, budgets, current ranking and recent routing decisions."""
+        return {
+            stage: {
+                "budget_s": self.budgets[stage],
+                "ranking": self._ranked_profiles(stage),
+                "profiles": {profile: stats.snapshot() for profile, stats in self.stats[stage].items()},
+                "recent": [entry for entry in self.routing_log if entry["stage"] == stage],
+            }
+            for stage in self.profiles
+        }
+
     async def summarize_tweet(self, tweet_content: str, max_summary_words: int = 10) -> str:
         """Summarizes the tweet content using OpenAI API."""
         if not tweet_content.strip():
@@ -19,16 +160,16 @@ class AIProcessor:
         try:
             prompt = f"Summarize the following tweet in {max_summary_words} words or less, focusing on keywords that would make a good token name or theme. Extract the most impactful and memorable part. Tweet: \"" + tweet_content + "\""
             
-            # Using ChatCompletion for newer models
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-3.5-turbo", # Or a newer/cheaper model if suitable
+            # Using ChatCompletion for newer models; the model is picked by latency-aware routing
+            response = await self._route("summary", lambda model: openai.ChatCompletion.acreate(
+                model=model,
                 messages=[
                     {"role": "system", "content": "You are an expert at summarizing tweets into very short, impactful phrases suitable for creating crypto token themes."},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=30, # Adjusted for short summary
                 temperature=0.5 # Moderately creative
-            )
+            ))
             summary = response.choices[0].message.content.strip()
             # Further clean up common chat model pleasantries if any
             summary = summary.replace("\"", "").replace("Sure, here's a summary: ", "").replace("Here's a summary: ", "")
@@ -51,14 +192,15 @@ class AIProcessor:
         logger.info(f"Generated image prompt: '{prompt}' from summary: '{summary}'")
         return prompt
 
-    async def generate_image(self, image_prompt: str, image_size: str = "256x256") -> str | None:
-        """Generates an image using DALL-E and returns its URL."""
+    async def generate_image(self, image_prompt: str, image_size: str | None = None) -> str | None:
+        """Generates an image using DALL-E and returns its URL. The size is routed unless given explicitly."""
         try:
-            response = await openai.Image.acreate(
+            request = lambda size: openai.Image.acreate(
                 prompt=image_prompt,
                 n=1,
-                size=image_size # DALL-E supported sizes: 256x256, 512x512, or 1024x1024
+                size=size # DALL-E supported sizes: 256x256, 512x512, or 1024x1024
             )
+            response = await (request(image_size) if image_size else self._route("image", request))
             image_url = response["data"][0]["url"]
             logger.info(f"Generated image URL: {image_url} for prompt: '{image_prompt}'")
             return image_url
@@ -102,6 +244,7 @@ async def _test_ai_processor():
     
     coin_description = processor.generate_coin_description(twitter_user)
     logger.info(f"[TEST] Coin Description: {coin_description}")
+    logger.info(f"[TEST] Routing stats: {processor.get_routing_stats()}")
 
 if __name__ == "__main__":
     # Ensure OPENAI_API_KEY is set in your environment to run this test
@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+import psutil
+
+logger = logging.getLogger(__name__)
+
+class BrowserWatchdog:
+    """Keeps a healthy Chrome driver available for PumpSeleniumBot.
+
+    The active driver is recycled after `max_launches` token launches or once the
+    browser process tree grows past `max_rss_mb`. When `hot_standby` is enabled a
+    second driver is started in the background so a swap does not pay a cold start.
+    """
+
+    def __init__(self, driver_factory, max_launches: int = 20, max_rss_mb: int = 1500, hot_standby: bool = True):
+        if max_launches < 1:
+            raise ValueError("max_launches must be at least 1.")
+        if max_rss_mb < 1:
+            raise ValueError("max_rss_mb must be at least 1.")
+        self.driver_factory = driver_factory
+        self.max_launches = max_launches
+        self.max_rss_mb = max_rss_mb
+        self.hot_standby = hot_standby
+
+        self.driver = None
+        self.launches_on_driver = 0
+        self._standby = None
+        self._standby_thread = None
+        # Each standby start remembers the generation it began in. shutdown() and disabling hot standby bump it,
+        # so a start still in flight sees a newer generation when its driver is ready and quits that driver itself
+        self._standby_generation = 0
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "drivers_started": 0,
+            "cold_starts": 0,
+            "standby_swaps": 0,
+            "crashes": 0,
+            "recycles_launch_limit": 0,
+            "recycles_memory": 0,
+            "standby_failures": 0,
+            "last_rss_mb": 0.0,
+        }
+
+    def acquire(self):
+        """Returns a live driver, replacing the current one if it crashed or needs recycling."""
+        if self.driver is not None:
+            if not self._is_alive(self.driver):
+                logger.error("Chrome driver is not responding. Replacing crashed driver.")
+                self.metrics["crashes"] += 1
+                self._discard(self.driver)
+                self.driver = None
+            else:
+                reason = self._recycle_reason(self.driver)
+                if reason:
+                    logger.info(f"Recycling Chrome driver ({reason}).")
+                    self.metrics[f"recycles_{reason}"] += 1
+                    self._discard(self.driver)
+                    self.driver = None
+
+        if self.driver is None:
+            self.driver = self._take_standby() or self._cold_start()
+            self.launches_on_driver = 0
+
+        self._ensure_standby()
+        return self.driver
+
+    def configure(self, max_launches: int, max_rss_mb: int, hot_standby: bool):
+        """Applies new recycling limits; they are checked on the next acquire()."""
+        if max_launches < 1 or max_rss_mb < 1:
+            raise ValueError("max_launches and max_rss_mb must be at least 1.")
+        self.max_launches = max_launches
+        self.max_rss_mb = max_rss_mb
+        self.hot_standby = hot_standby
+        if not hot_standby:
+            with self._lock:
+                self._standby_generation += 1
+                standby, self._standby = self._standby, None
+            if standby is not None:
+                logger.info("Hot standby disabled. Quitting standby Chrome driver.")
+                self._discard(standby)
+
+    def record_launch(self):
+        """Counts one token launch against the active driver."""
+        self.launches_on_driver += 1
+
+    def get_metrics(self) -> dict:
+        return dict(self.metrics, launches_on_driver=self.launches_on_driver, standby_ready=self._standby is not None)
+
+    def shutdown(self):
+        """Quits the active and standby drivers."""
+        with self._lock:
+            self._standby_generation += 1
+            standby, self._standby = self._standby, None
+        for driver in (self.driver, standby):
+            if driver is not None:
+                self._discard(driver)
+        self.driver = None
+        self.launches_on_driver = 0
+
+    def _recycle_reason(self, driver) -> str | None:
+        if self.launches_on_driver >= self.max_launches:
+            return "launch_limit"
+        rss_mb = self._rss_mb(driver)
+        self.metrics["last_rss_mb"] = rss_mb
+        if rss_mb > self.max_rss_mb:
+            logger.warning(f"Chrome process tree uses {rss_mb:.0f} MB (limit {self.max_rss_mb} MB).")
+            return "memory"
+        return None
+
+    def _is_alive(self, driver) -> bool:
+        try:
+            driver.execute_script("return 1;")
+            return True
+        except Exception as e:
+            logger.debug(f"Driver liveness check failed: {e}")
+            return False
+
+    def _rss_mb(self, driver) -> float:
+        """Sums the resident memory of chromedriver and every browser process it spawned."""
+        try:
+            root = psutil.Process(driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except (AttributeError, psutil.Error) as e:
+            logger.debug(f"Could not inspect Chrome process tree: {e}")
+            return 0.0
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue # Process exited while we were walking the tree
+        return total / (1024 * 1024)
+
+    def _cold_start(self):
+        logger.info("Starting Chrome driver (cold start).")
+        driver = self.driver_factory()
+        self.metrics["drivers_started"] += 1
+        self.metrics["cold_starts"] += 1
+        return driver
+
+    def _take_standby(self):
+        with self._lock:
+            standby, self._standby = self._standby, None
+        if standby is None:
+            return None
+        if not self._is_alive(standby):
+            logger.warning("Standby Chrome driver died before use. Discarding it.")
+            self.metrics["crashes"] += 1
+            self._discard(standby)
+            return None
+        logger.info("Swapped in pre-started standby Chrome driver.")
+        self.metrics["standby_swaps"] += 1
+        return standby
+
+    def _ensure_standby(self):
+        if not self.hot_standby:
+            return
+        with self._lock:
+            if self._standby is not None or (self._standby_thread and self._standby_thread.is_alive()):
+                return
+            self._standby_thread = threading.Thread(target=self._start_standby, args=(self._standby_generation,), name="chrome-standby", daemon=True)
+            self._standby_thread.start()
+
+    def _start_standby(self, generation: int):
+        started_at = time.monotonic()
+        try:
+            driver = self.driver_factory()
+        except Exception as e:
+            logger.error(f"Failed to start standby Chrome driver: {e}")
+            self.metrics["standby_failures"] += 1
+            return
+        self.metrics["drivers_started"] += 1
+        with self._lock:
+            orphaned = generation != self._standby_generation
+            if not orphaned:
+                self._standby = driver
+        if orphaned:
+            logger.info("Standby Chrome driver finished starting after shutdown or disable. Quitting it.")
+            self._discard(driver)
+            return
+        logger.info(f"Standby Chrome driver ready after {time.monotonic() - started_at:.1f}s.")
+
+    def _discard(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Error while quitting Chrome driver: {e}")
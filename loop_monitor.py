@@ -0,0 +1,158 @@
+import os
+import sys
+import time
+import signal
+import asyncio
+import logging
+import threading
+import traceback
+from collections import Counter, deque
+
+logger = logging.getLogger(__name__)
+
+class LoopLagMonitor:
+    """Measures event-loop lag and reports the stack of whatever blocks the loop.
+
+    A heartbeat task sleeps for `check_interval_s` and records how late it wakes up. A
+    watchdog thread notices when the heartbeat stops for longer than `threshold_s` and
+    logs the loop thread's current stack, which points at the blocking call. Sending
+    SIGUSR1 runs a sampling profiler for `profile_duration_s` and writes a folded-stack
+    file (one `frame;frame;frame count` line per stack) for flamegraph.pl or speedscope.
+    """
+
+    def __init__(
+        self,
+        threshold_s: float = 0.1,
+        check_interval_s: float = 0.05,
+        profile_dir: str = "profiles",
+        profile_duration_s: float = 30.0,
+        sample_interval_s: float = 0.005
+    ):
+        self.threshold_s = threshold_s
+        self.check_interval_s = check_interval_s
+        self.profile_dir = profile_dir
+        self.profile_duration_s = profile_duration_s
+        self.sample_interval_s = sample_interval_s
+
+        self._loop_thread_id = None
+        self._last_beat = None
+        self._block_started = None # Heartbeat time of the block currently being reported, if any
+        self._heartbeat_task = None
+        self._watchdog_thread = None
+        self._profiler_thread = None
+        self._previous_sigusr1_handler = None
+        self._stop = threading.Event()
+        self._beat_lock = threading.Lock() # Guards _last_beat and _block_started across the loop and watchdog threads
+
+        self.recent_blocks = deque(maxlen=50)
+        self.metrics = {
+            "max_lag_s": 0.0,
+            "last_lag_s": 0.0,
+            "blocked_callbacks": 0,
+            "longest_block_s": 0.0,
+            "profiles_written": 0,
+        }
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = loop.create_task(self._heartbeat())
+        self._watchdog_thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog_thread.start()
+        try:
+            # A plain signal handler (unlike loop.add_signal_handler) runs even while the loop is stalled in a blocking call
+            self._previous_sigusr1_handler = signal.signal(signal.SIGUSR1, self._on_sigusr1)
+        except (AttributeError, ValueError):
+            logger.warning("SIGUSR1 profiling is not supported here; call start_profiling() directly.")
+        logger.info(f"Event loop lag monitor started (threshold {self.threshold_s * 1000:.0f} ms). Send SIGUSR1 to pid {os.getpid()} to profile.")
+
+    async def stop(self):
+        self._stop.set()
+        if self._previous_sigusr1_handler is not None:
+            signal.signal(signal.SIGUSR1, self._previous_sigusr1_handler)
+            self._previous_sigusr1_handler = None
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
+    def get_metrics(self) -> dict:
+        return dict(self.metrics, profiling=bool(self._profiler_thread and self._profiler_thread.is_alive()))
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.check_interval_s
+            await asyncio.sleep(self.check_interval_s)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            with self._beat_lock:
+                self._last_beat = now
+                block_started, self._block_started = self._block_started, None
+            self.metrics["last_lag_s"] = lag
+            self.metrics["max_lag_s"] = max(self.metrics["max_lag_s"], lag)
+            if block_started is not None:
+                duration = max(0.0, now - block_started - self.check_interval_s) # Time beyond the expected sleep
+                self.metrics["longest_block_s"] = max(self.metrics["longest_block_s"], duration)
+                if self.recent_blocks:
+                    self.recent_blocks[-1]["duration_s"] = round(duration, 3)
+                logger.warning(f"Event loop was blocked for {duration * 1000:.0f} ms.")
+
+    def _watch(self):
+        while not self._stop.wait(self.check_interval_s / 2):
+            with self._beat_lock:
+                # Checked and marked atomically, so a block is always tied to the beat that preceded it
+                stalled = time.monotonic() - self._last_beat - self.check_interval_s
+                if stalled < self.threshold_s or self._block_started is not None:
+                    continue # Not blocked, or this block was already reported
+                self._block_started = self._last_beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<loop thread stack unavailable>"
+            self.metrics["blocked_callbacks"] += 1
+            self.recent_blocks.append({"at": time.time(), "duration_s": None, "stack": stack})
+            logger.warning(f"Event loop blocked for more than {self.threshold_s * 1000:.0f} ms. Loop thread stack:\n{stack}")
+
+    def start_profiling(self, duration_s: float | None = None) -> bool:
+        """Samples every thread's stack in the background and writes a folded-stack file when done."""
+        if self._profiler_thread and self._profiler_thread.is_alive():
+            return False
+        self._profiler_thread = threading.Thread(target=self._profile, args=(duration_s or self.profile_duration_s,), name="sampling-profiler", daemon=True)
+        self._profiler_thread.start()
+        return True
+
+    def _on_sigusr1(self, signum, frame):
+        # Only starts the sampler thread; logging happens there to keep the handler safe
+        self.start_profiling()
+
+    def _profile(self, duration_s: float):
+        logger.info(f"Sampling profiler started for {duration_s:g}s.")
+        samples = Counter()
+        skipped = {threading.get_ident(), self._watchdog_thread.ident if self._watchdog_thread else None}
+        thread_names = {}
+        deadline = time.monotonic() + duration_s
+        while time.monotonic() < deadline and not self._stop.is_set():
+            if len(thread_names) != threading.active_count():
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident in skipped: # The monitor's own threads would only add noise
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                frames.append(thread_names.get(ident, str(ident)))
+                samples[";".join(reversed(frames))] += 1
+            time.sleep(self.sample_interval_s)
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"profile-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}.folded")
+        with open(path, "w") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        self.metrics["profiles_written"] += 1
+        logger.info(f"Sampling profile written to {path} ({sum(samples.values())} samples). Render with flamegraph.pl or speedscope.")
@@ -0,0 +1,366 @@
+import os
+import time
+import signal
+import asyncio
+import logging
+import multiprocessing as mp
+from multiprocessing.connection import wait
+from collections import deque
+
+from settings import Settings, SettingsReloader
+from pipeline import (
+    apply_settings,
+    build_ai_processor,
+    build_loop_monitor,
+    build_pump_bot,
+    build_telegram_notifier,
+    build_twitter_watcher,
+    launch_and_notify,
+    prepare_launch,
+    remove_image,
+)
+from ticker_generator import TickerGenerator
+
+logger = logging.getLogger(__name__)
+
+QUEUE_MAX_SIZE = 100 # Tweets or jobs held by the supervisor while every consumer is busy
+PIPE_POLL_TIMEOUT = 1.0 # Seconds; keeps executor threads from blocking shutdown
+RESTART_WINDOW_S = 300 # Restarts older than this no longer increase the backoff
+MAX_RESTART_BACKOFF_S = 60
+SHUTDOWN_GRACE_S = 120 # Login, form filling and the Telegram message, on top of LAUNCH_CONFIRM_TIMEOUT
+
+# --- Child process helpers ---
+
+def _setup_child():
+    """Configures process group, logging and signals in a freshly spawned child."""
+    # Own process group (pgid == pid) so the supervisor can reap chromedriver/Chrome if this child dies
+    os.setpgid(0, 0)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s', force=True)
+    # The supervisor coordinates shutdown with SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+async def _recv(conn):
+    """Waits for the next message from the supervisor. Raises EOFError if the supervisor went away."""
+    loop = asyncio.get_running_loop()
+    while not await loop.run_in_executor(None, conn.poll, PIPE_POLL_TIMEOUT):
+        pass
+    return conn.recv()
+
+async def _send(conn, kind: str, payload=None):
+    await asyncio.get_running_loop().run_in_executor(None, conn.send, (kind, payload))
+
+async def _run_role(conn, settings: Settings, modules: dict, body):
+    """Runs `body(reloader)` with loop monitoring, live reload and SIGTERM-triggered shutdown."""
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    loop_monitor = build_loop_monitor(settings)
+    loop_monitor.start()
+    reloader = SettingsReloader(
+        current=settings,
+        on_change=lambda old, new, changed: apply_settings(old, new, changed, loop_monitor=loop_monitor, **modules)
+    )
+    # The supervisor's settings may predate .env edits made before this (re)start; pick up the live fields
+    # the same way a reload would, so restart-only fields stay as started and an invalid file is ignored
+    reloader.reload()
+    reloader.start()
+    try:
+        # SIGHUP and SIGUSR1 would kill the process until the handlers above exist; the supervisor waits for this
+        await _send(conn, "started")
+        await body(reloader)
+    except asyncio.CancelledError:
+        logger.info("Shutdown requested by supervisor.")
+    except (EOFError, BrokenPipeError):
+        logger.error("Lost the connection to the supervisor; exiting.")
+    finally:
+        await reloader.stop()
+        await loop_monitor.stop()
+
+# --- Child process entry points (module level so the spawn start method can import them) ---
+
+# Each child talks only to the supervisor over its own Pipe, so a child that is killed mid-message
+# breaks just its own connection and not a queue shared with the other children.
+
+def ingest_process(conn, settings: Settings):
+    """Watches Twitter and feeds new tweets to the processing workers."""
+    _setup_child()
+    twitter_watcher = build_twitter_watcher(settings)
+
+    async def body(reloader):
+        async for tweet in twitter_watcher.watch():
+            logger.info(f"--- New Tweet Detected --- ID: {tweet['id']} from @{tweet['username']}")
+            await _send(conn, "tweet", tweet)
+
+    asyncio.run(_run_role(conn, settings, {"twitter_watcher": twitter_watcher}, body))
+
+def worker_process(conn, settings: Settings):
+    """Runs the AI, image download and ticker stages and hands launch jobs to the launcher."""
+    _setup_child()
+    ai_processor = build_ai_processor(settings)
+    ticker_generator = TickerGenerator()
+
+    async def body(reloader):
+        while True:
+            await _send(conn, "ready") # One tweet at a time; the supervisor holds the rest
+            tweet = await _recv(conn)
+            try:
+                job = await prepare_launch(tweet, ai_processor, ticker_generator)
+            except Exception as e:
+                logger.error(f"Error preparing launch for tweet ID {tweet.get('id', 'N/A')}: {e}", exc_info=True)
+                continue
+            if job:
+                try:
+                    await _send(conn, "job", job)
+                except asyncio.CancelledError:
+                    remove_image(job["local_image_path"]) # Nobody will launch it
+                    raise
+            logger.debug(f"AI routing stats: {ai_processor.get_routing_stats()}")
+
+    asyncio.run(_run_role(conn, settings, {"ai_processor": ai_processor}, body))
+
+def launcher_process(conn, settings: Settings):
+    """Owns the Chrome session: creates tokens on Pump.fun and sends Telegram notifications."""
+    _setup_child()
+    pump_bot = build_pump_bot(settings)
+    telegram_notifier = build_telegram_notifier(settings)
+
+    async def launch(job, settings):
+        tweet_id = job["tweet"]["id"]
+        try:
+            if await launch_and_notify(job, settings, pump_bot, telegram_notifier):
+                logger.info(f"--- Successfully processed tweet ID: {tweet_id} ---")
+        except Exception as e:
+            logger.error(f"Error launching token for tweet ID {tweet_id}: {e}", exc_info=True)
+
+    async def body(reloader):
+        try:
+            while True:
+                await _send(conn, "ready")
+                job = await _recv(conn)
+                # SIGTERM cancels this task, but a launch that has started runs to the end (including
+                # the Telegram message) before Chrome is closed; the supervisor allows for this
+                task = asyncio.ensure_future(launch(job, reloader.current))
+                try:
+                    await asyncio.shield(task)
+                except asyncio.CancelledError:
+                    logger.info(f"Shutdown requested; finishing the launch for tweet ID {job['tweet']['id']} first.")
+                    while not task.done():
+                        try:
+                            await asyncio.shield(task)
+                        except asyncio.CancelledError:
+                            pass
+                    raise
+        finally:
+            pump_bot.close()
+
+    asyncio.run(_run_role(conn, settings, {"pump_bot": pump_bot, "telegram_notifier": telegram_notifier}, body))
+
+# --- Supervisor ---
+
+class ChildSpec:
+    def __init__(self, name: str, target):
+        self.name = name
+        self.target = target
+        self.process = None
+        self.conn = None # Supervisor's end of the child's Pipe, replaced on every start
+        self.started = False # The child installed its signal handlers
+        self.ready = False # The child asked for its next item
+        self.in_flight = None # Item handed to the child and not yet finished
+        self.restarts = deque()
+        self.next_start_at = 0.0
+
+class ProcessSupervisor:
+    """Starts the child processes, routes tweets and launch jobs between them, restarts any
+    that exit with backoff, and shuts them all down together.
+
+    Tweets from `ingest` go to whichever worker is ready, and jobs from the workers go to the
+    launcher. Items waiting for a consumer are held here, up to QUEUE_MAX_SIZE per stage.
+    """
+
+    def __init__(self, ctx, settings: Settings, ingest: ChildSpec, workers: list[ChildSpec], launcher: ChildSpec, shutdown_timeout_s: float):
+        self.ctx = ctx
+        self.settings = settings # Validated once here and handed to every child, including restarts
+        self.ingest = ingest
+        self.workers = workers
+        self.launcher = launcher
+        self.children = [ingest, *workers, launcher]
+        self.shutdown_timeout_s = shutdown_timeout_s
+        self.pending_tweets = deque()
+        self.pending_jobs = deque()
+        self._stopping = False
+        self.metrics = {child.name: {"starts": 0, "restarts": 0, "last_exitcode": None, "lost_items": 0} for child in self.children}
+        self.metrics["dropped_tweets"] = 0
+        self.metrics["dropped_jobs"] = 0
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGHUP, self._forward_signal)
+        signal.signal(signal.SIGUSR1, self._forward_signal)
+        logger.info(f"Supervisor started (pid {os.getpid()}). SIGHUP and SIGUSR1 are forwarded to all children.")
+        try:
+            while not self._stopping:
+                for child in self.children:
+                    self._check(child)
+                self._receive(timeout=0.5)
+                self._dispatch(self.pending_tweets, self.workers)
+                self._dispatch(self.pending_jobs, [self.launcher])
+        finally:
+            self._shutdown()
+
+    def _check(self, child: ChildSpec):
+        if child.process is not None:
+            if child.process.is_alive():
+                return
+            exitcode = child.process.exitcode
+            self._kill_process_group(child.process)
+            self._disconnect(child)
+            child.process = None
+            self.metrics[child.name]["last_exitcode"] = exitcode
+            now = time.monotonic()
+            while child.restarts and now - child.restarts[0] > RESTART_WINDOW_S:
+                child.restarts.popleft()
+            backoff = min(MAX_RESTART_BACKOFF_S, 2 ** len(child.restarts))
+            child.restarts.append(now)
+            child.next_start_at = now + backoff
+            self.metrics[child.name]["restarts"] += 1
+            logger.error(f"Child process {child.name} exited with code {exitcode}; restarting in {backoff}s.")
+
+        if time.monotonic() >= child.next_start_at:
+            child.conn, child_conn = self.ctx.Pipe()
+            child.process = self.ctx.Process(target=child.target, args=(child_conn, self.settings), name=child.name, daemon=False)
+            child.started = False
+            child.process.start()
+            child_conn.close() # Only the child holds this end, so its exit shows up as EOF here
+            self.metrics[child.name]["starts"] += 1
+            logger.info(f"Started child process {child.name} (pid {child.process.pid}).")
+
+    def _disconnect(self, child: ChildSpec):
+        if child.conn is not None:
+            child.conn.close()
+            child.conn = None
+        child.started = False
+        child.ready = False
+        if child.in_flight is not None:
+            # Not retried: the child may have got far enough to launch the token already
+            self.metrics[child.name]["lost_items"] += 1
+            logger.error(f"Child process {child.name} stopped while handling tweet ID {self._tweet_id(child.in_flight)}; it will not be retried.")
+            self._remove_job_image(child.in_flight)
+            child.in_flight = None
+
+    @staticmethod
+    def _remove_job_image(item):
+        if "local_image_path" in item: # Launch jobs only; tweets have no image yet
+            remove_image(item["local_image_path"])
+
+    def _receive(self, timeout: float):
+        conns = {child.conn: child for child in self.children if child.conn is not None}
+        if not conns:
+            time.sleep(timeout)
+            return
+        for conn in wait(list(conns), timeout=timeout):
+            child = conns[conn]
+            try:
+                kind, payload = conn.recv()
+            except (EOFError, OSError):
+                # The child is exiting; _check restarts it once the process is gone
+                conn.close()
+                child.conn = None
+                continue
+            if kind == "started":
+                child.started = True
+            elif kind == "ready":
+                child.ready = True
+                child.in_flight = None
+            elif kind == "tweet":
+                self._enqueue(self.pending_tweets, payload, "dropped_tweets")
+            elif kind == "job":
+                self._enqueue(self.pending_jobs, payload, "dropped_jobs")
+
+    def _enqueue(self, pending: deque, item, metric: str):
+        if len(pending) >= QUEUE_MAX_SIZE:
+            dropped = pending.popleft() # Oldest first; newer tweets are worth more
+            if metric == "dropped_jobs":
+                remove_image(dropped["local_image_path"])
+            self.metrics[metric] += 1
+            logger.warning(f"Backlog full; dropped tweet ID {self._tweet_id(dropped)}.")
+        pending.append(item)
+
+    def _dispatch(self, pending: deque, consumers: list[ChildSpec]):
+        for child in consumers:
+            if not pending:
+                return
+            if not child.ready or child.conn is None:
+                continue
+            item = pending.popleft()
+            try:
+                child.conn.send(item)
+            except OSError:
+                pending.appendleft(item) # Not delivered; goes to the next ready consumer
+                continue
+            child.ready = False
+            child.in_flight = item
+
+    @staticmethod
+    def _tweet_id(item) -> str:
+        tweet = item.get("tweet", item)
+        return tweet.get("id", "N/A")
+
+    def _request_stop(self, signum, frame):
+        logger.info(f"Received signal {signal.Signals(signum).name}; stopping child processes.")
+        self._stopping = True
+
+    def _forward_signal(self, signum, frame):
+        for child in self.children:
+            if child.process is None or not child.process.is_alive():
+                continue
+            if not child.started:
+                # A child that is still starting reads the latest .env anyway
+                logger.warning(f"Child process {child.name} is still starting; not sending it {signal.Signals(signum).name}.")
+                continue
+            os.kill(child.process.pid, signum)
+
+    def _kill_process_group(self, process):
+        """Kills anything the child left behind in its process group, such as chromedriver and Chrome."""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+            logger.warning(f"Killed leftover processes of child {process.name}.")
+        except (ProcessLookupError, PermissionError):
+            pass # Nothing left in the group
+
+    def _shutdown(self):
+        running = [child.process for child in self.children if child.process is not None]
+        for process in running:
+            if process.is_alive():
+                process.terminate() # SIGTERM; children cancel their work and close Chrome
+        deadline = time.monotonic() + self.shutdown_timeout_s
+        for process in running:
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Child process {process.name} did not stop in time; killing it.")
+                process.kill()
+                process.join()
+            self._kill_process_group(process)
+        for child in self.children:
+            if child.conn is not None:
+                child.conn.close()
+                child.conn = None
+            if child.in_flight is not None:
+                self._remove_job_image(child.in_flight) # Usually already removed, unless the launcher was killed
+                child.in_flight = None
+        for job in self.pending_jobs:
+            remove_image(job["local_image_path"])
+        if self.pending_tweets or self.pending_jobs:
+            logger.warning(f"Discarded {len(self.pending_tweets)} pending tweet(s) and {len(self.pending_jobs)} pending launch job(s).")
+        logger.info(f"All child processes stopped. Supervisor metrics: {self.metrics}")
+
+def run_multiprocess(settings: Settings):
+    """Runs ingest, processing workers and the launcher as separate supervised processes."""
+    # spawn gives every child a clean interpreter, which is safer with Chrome and threads than fork
+    ctx = mp.get_context("spawn")
+    ingest = ChildSpec("ingest", ingest_process)
+    workers = [ChildSpec(f"worker-{i}", worker_process) for i in range(settings.process_workers)]
+    # A single launcher: the Pump.fun session lives in one browser
+    launcher = ChildSpec("launcher", launcher_process)
+
+    logger.info(f"Starting multi-process mode with {settings.process_workers} processing worker(s).")
+    ProcessSupervisor(ctx, settings, ingest, workers, launcher, shutdown_timeout_s=settings.launch_confirm_timeout + SHUTDOWN_GRACE_S).run()
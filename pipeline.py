@@ -0,0 +1,202 @@
+import os
+import uuid
+import asyncio
+import logging
+import functools
+import requests # For downloading the image
+
+from twitter_watcher import TwitterWatcher
+from ai_processor import AIProcessor
+from ticker_generator import TickerGenerator
+from selenium_pump_bot import PumpSeleniumBot
+from telegram_notifier import TelegramNotifier
+from loop_monitor import LoopLagMonitor
+from settings import Settings
+
+logger = logging.getLogger(__name__)
+
+IMAGE_DIR = "/home/ubuntu/solana_token_bot/images"
+
+# --- Module factories, shared by the single-process and multi-process modes ---
+
+def build_twitter_watcher(settings: Settings) -> TwitterWatcher:
+    return TwitterWatcher(usernames_str=",".join(settings.twitter_usernames), poll_interval=settings.tweet_poll_interval)
+
+def build_ai_processor(settings: Settings) -> AIProcessor:
+    return AIProcessor(
+        openai_api_key=settings.openai_api_key,
+        chat_models=list(settings.ai_chat_models),
+        image_sizes=list(settings.ai_image_sizes),
+        summary_budget_s=settings.ai_summary_budget_s,
+        image_budget_s=settings.ai_image_budget_s
+    )
+
+def build_pump_bot(settings: Settings) -> PumpSeleniumBot:
+    return PumpSeleniumBot(
+        profile_dir=settings.chrome_profile_dir,
+        driver_path=settings.chromedriver_path,
+        headless=settings.pump_headless,
+        pump_fun_username=settings.pump_fun_username,
+        pump_fun_password=settings.pump_fun_password,
+        solana_private_key=settings.solana_private_key,
+        max_launches_per_driver=settings.browser_max_launches,
+        max_driver_rss_mb=settings.browser_max_rss_mb,
+        hot_standby=settings.browser_hot_standby
+    )
+
+def build_telegram_notifier(settings: Settings) -> TelegramNotifier:
+    return TelegramNotifier(bot_token=settings.telegram_bot_token, chat_ids_str=",".join(settings.telegram_chat_ids))
+
+def build_loop_monitor(settings: Settings) -> LoopLagMonitor:
+    return LoopLagMonitor(
+        threshold_s=settings.loop_lag_threshold_ms / 1000,
+        profile_dir=settings.profile_dir,
+        profile_duration_s=settings.profile_duration_s
+    )
+
+def apply_settings(
+    old: Settings,
+    new: Settings,
+    changed: set[str],
+    twitter_watcher: TwitterWatcher | None = None,
+    ai_processor: AIProcessor | None = None,
+    telegram_notifier: TelegramNotifier | None = None,
+    pump_bot: PumpSeleniumBot | None = None,
+    loop_monitor: LoopLagMonitor | None = None
+) -> set[str]:
+    """Pushes reloaded settings into whichever modules this process runs. Per-launch values are read from the reloader directly.
+
+    Each module is updated independently so one failure does not skip the rest. Returns the fields that failed to apply.
+    """
+    failed = set()
+
+    def apply(module, field_names: set[str], update):
+        affected = changed & field_names
+        if module is None or not affected:
+            return
+        try:
+            update()
+        except Exception as e:
+            logger.error(f"Could not apply {', '.join(sorted(affected))}: {e}", exc_info=True)
+            failed.update(affected)
+
+    apply(twitter_watcher, {"twitter_usernames"}, lambda: twitter_watcher.update_usernames(list(new.twitter_usernames)))
+    apply(twitter_watcher, {"tweet_poll_interval"}, lambda: setattr(twitter_watcher, "poll_interval", new.tweet_poll_interval))
+    apply(telegram_notifier, {"telegram_chat_ids"}, lambda: telegram_notifier.update_chat_ids(list(new.telegram_chat_ids)))
+    apply(ai_processor, {"ai_chat_models", "ai_image_sizes", "ai_summary_budget_s", "ai_image_budget_s"}, lambda: ai_processor.configure_routing(
+        chat_models=list(new.ai_chat_models),
+        image_sizes=list(new.ai_image_sizes),
+        summary_budget_s=new.ai_summary_budget_s,
+        image_budget_s=new.ai_image_budget_s
+    ))
+    apply(pump_bot, {"browser_max_launches", "browser_max_rss_mb", "browser_hot_standby"}, lambda: pump_bot.watchdog.configure(
+        max_launches=new.browser_max_launches,
+        max_rss_mb=new.browser_max_rss_mb,
+        hot_standby=new.browser_hot_standby
+    ))
+    apply(loop_monitor, {"loop_lag_threshold_ms"}, lambda: setattr(loop_monitor, "threshold_s", new.loop_lag_threshold_ms / 1000))
+    apply(loop_monitor, {"profile_dir"}, lambda: setattr(loop_monitor, "profile_dir", new.profile_dir))
+    apply(loop_monitor, {"profile_duration_s"}, lambda: setattr(loop_monitor, "profile_duration_s", new.profile_duration_s))
+    if "tweet_poll_interval" in changed and "tweet_poll_interval" not in failed and twitter_watcher:
+        logger.info(f"Tweet poll interval changed from {old.tweet_poll_interval}s to {new.tweet_poll_interval}s.")
+    return failed
+
+# --- Pipeline stages ---
+
+def remove_image(local_image_path: str | None):
+    if local_image_path and os.path.exists(local_image_path):
+        try: os.remove(local_image_path)
+        except OSError as e: logger.warning(f"Could not remove temporary image {local_image_path}: {e}")
+
+async def prepare_launch(tweet: dict, ai_processor: AIProcessor, ticker_generator: TickerGenerator) -> dict | None:
+    """Runs the AI and ticker stages for a tweet. Returns a picklable launch job, or None if the tweet should be skipped."""
+    # 1. AI Processing: Summarize, generate image prompt, image, description
+    summary = await ai_processor.summarize_tweet(tweet["content"])
+    if not summary or summary.startswith("Error:"):
+        logger.error(f"Failed to get valid summary for tweet {tweet['id']}. Skipping token creation.")
+        return None
+
+    image_prompt = ai_processor.generate_image_prompt(summary)
+    image_url_from_ai = await ai_processor.generate_image(image_prompt)
+
+    if not image_url_from_ai:
+        logger.error(f"Failed to generate image for tweet {tweet['id']}. Skipping token creation.")
+        return None
+
+    # Download image locally as Pump.fun likely needs an upload
+    try:
+        img_response = requests.get(image_url_from_ai, timeout=20)
+        img_response.raise_for_status()
+        image_ext = os.path.splitext(image_url_from_ai.split("?")[0])[-1] or ".png"
+        if not image_ext.startswith("."): image_ext = "." + image_ext # ensure dot
+        # ensure images directory exists (should be created by setup script or manually)
+        os.makedirs(IMAGE_DIR, exist_ok=True)
+        local_image_path = f"{IMAGE_DIR}/{uuid.uuid4()}{image_ext}"
+        with open(local_image_path, "wb") as f:
+            f.write(img_response.content)
+        logger.info(f"Image downloaded successfully to {local_image_path}")
+    except Exception as img_e:
+        logger.error(f"Failed to download image from {image_url_from_ai}: {img_e}")
+        return None # Skip if image download fails
+
+    coin_description = ai_processor.generate_coin_description(tweet["username"])
+
+    # 2. Generate Ticker and Token Name
+    ticker = ticker_generator.generate_ticker(summary) # Or tweet content
+    token_name = ticker_generator.generate_token_name(summary) # Or a more descriptive name
+    logger.info(f"Generated Token Name: '{token_name}', Ticker: '{ticker}'")
+
+    return {
+        "tweet": tweet,
+        "summary": summary,
+        "image_url": image_url_from_ai,
+        "local_image_path": local_image_path,
+        "description": coin_description,
+        "ticker": ticker,
+        "token_name": token_name,
+    }
+
+async def launch_and_notify(job: dict, settings: Settings, pump_bot: PumpSeleniumBot, telegram_notifier: TelegramNotifier) -> bool:
+    """Creates the token on Pump.fun and sends the Telegram notification. Always removes the job's image."""
+    tweet = job["tweet"]
+    # Selenium calls block for seconds at a time; running them in a thread keeps the event loop
+    # (signal handling, config reload, lag monitoring) responsive during a launch
+    loop = asyncio.get_running_loop()
+    try:
+        # 3. Solana/Pump.fun Interaction
+        logger.info("Connecting to Pump.fun and logging in...")
+        await loop.run_in_executor(None, pump_bot.connect_wallet_and_login) # This method initializes driver if needed
+
+        logger.info(f"Attempting to create token on Pump.fun: {job['token_name']} ({job['ticker']})")
+        launch_result = await loop.run_in_executor(None, functools.partial(
+            pump_bot.create_token,
+            token_name=job["token_name"],
+            token_ticker=job["ticker"],
+            description=job["description"],
+            image_path=job["local_image_path"],
+            tweet_url=tweet["url"],
+            initial_buy_sol=settings.initial_buy_sol,
+            token_telegram_link=settings.token_telegram_link,
+            token_website_link=settings.token_website_link,
+            confirmation_timeout=settings.launch_confirm_timeout
+        ))
+        logger.info(f"Browser watchdog metrics: {pump_bot.get_metrics()}")
+    finally:
+        remove_image(job["local_image_path"])
+
+    if not launch_result:
+        logger.error(f"Failed to create token on Pump.fun for tweet {tweet['id']}.")
+        return False
+
+    logger.info(f"Token successfully created on Pump.fun: {launch_result.token_url} (address {launch_result.token_address}, confirmed via {launch_result.confirmed_via} in {launch_result.confirm_seconds:.1f}s)")
+
+    # 4. Telegram Notification
+    logger.info(f"Sending Telegram notification for token {job['ticker']}...")
+    await telegram_notifier.send_message(
+        ticker=job["ticker"],
+        token_pump_fun_url=launch_result.token_url,
+        original_tweet_url=tweet["url"],
+        summary=job["summary"],
+        image_url=job["image_url"] # Send the AI URL, not local path
+    )
+    return True
@@ -5,16 +5,100 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from dataclasses import dataclass
+from collections import deque
+import json
+import base64
+import binascii
 import logging
+import re
 import time
 import os
+from urllib.parse import urlparse
+
+from browser_watchdog import BrowserWatchdog
 
 logger = logging.getLogger(__name__)
 
 PUMP_FUN_URL = "https://pump.fun"
+# Solana addresses are base58 encoded public keys (32-44 characters)
+TOKEN_PAGE_URL_PATTERN = re.compile(r"^https?://(?:www\.)?pump\.fun/(?:coin/)?([1-9A-HJ-NP-Za-km-z]{32,44})(?:[/?#]|$)")
+SOLANA_ADDRESS_PATTERN = re.compile(r"[1-9A-HJ-NP-Za-km-z]{32,44}")
+# Fields that always name the token's mint, wherever they appear in the response
+TOKEN_ADDRESS_FIELDS = ("mint", "tokenAddress", "token_address")
+# A bare "address" could be the creator's wallet, so it only counts at the top level or on the coin object itself
+COIN_OBJECT_FIELDS = ("coin", "token")
+# Exact URL paths of the create API; only POSTs to these (sent after the final click) can confirm a launch
+CREATE_ENDPOINT_PATHS = ("/create", "/coins/create")
+
+@dataclass
+class LaunchResult:
+    token_address: str
+    token_url: str
+    confirmed_via: str # "redirect", "navigation" or "response"
+    form_seconds: float # Time spent opening and filling the creation form
+    confirm_seconds: float # Time from the final click until DevTools reported the new token
+    total_seconds: float
+
+def _token_address_from_url(url: str) -> str | None:
+    match = TOKEN_PAGE_URL_PATTERN.match(url or "")
+    return match.group(1) if match else None
+
+def _is_create_request(request: dict) -> bool:
+    if request.get("method") != "POST":
+        return False
+    return urlparse(request.get("url", "")).path.rstrip("/") in CREATE_ENDPOINT_PATHS
+
+def _token_address_from_body(response: dict) -> str | None:
+    """Looks for the new token's mint address in a `Network.getResponseBody` result."""
+    body = response.get("body")
+    try:
+        if response.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8")
+        data = json.loads(body)
+    except (TypeError, ValueError, binascii.Error):
+        return None
+
+    def address_in(item: dict, field_names) -> str | None:
+        for field in field_names:
+            value = item.get(field)
+            if isinstance(value, str) and SOLANA_ADDRESS_PATTERN.fullmatch(value):
+                return value
+        return None
+
+    # Breadth first and in document order, so the shallowest mint field wins
+    candidates = deque([data])
+    while candidates:
+        item = candidates.popleft()
+        if isinstance(item, dict):
+            address = address_in(item, TOKEN_ADDRESS_FIELDS)
+            if address:
+                return address
+            candidates.extend(item.values())
+        elif isinstance(item, list):
+            candidates.extend(item)
+
+    if isinstance(data, dict):
+        coin_objects = [data] + [data[field] for field in COIN_OBJECT_FIELDS if isinstance(data.get(field), dict)]
+        for item in coin_objects:
+            address = address_in(item, ("address",))
+            if address:
+                return address
+    return None
 
 class PumpSeleniumBot:
-    def __init__(self, profile_dir: str, driver_path: str, headless: bool, pump_fun_username: str, pump_fun_password: str, solana_private_key: str):
+    def __init__(
+        self,
+        profile_dir: str,
+        driver_path: str,
+        headless: bool,
+        pump_fun_username: str,
+        pump_fun_password: str,
+        solana_private_key: str,
+        max_launches_per_driver: int = 20,
+        max_driver_rss_mb: int = 1500,
+        hot_standby: bool = True
+    ):
         self.chrome_profile_dir = profile_dir
         self.chromedriver_path = driver_path
         self.headless = headless
@@ -26,7 +110,14 @@ class PumpSeleniumBot:
         if not all([self.pump_fun_username, self.pump_fun_password, self.solana_private_key]):
             raise ValueError("Pump.fun credentials and Solana private key must be provided.")
 
-    def _initialize_driver(self):
+        self.watchdog = BrowserWatchdog(
+            driver_factory=self._build_driver,
+            max_launches=max_launches_per_driver,
+            max_rss_mb=max_driver_rss_mb,
+            hot_standby=hot_standby
+        )
+
+    def _build_driver(self):
         logger.info(f"Initializing Chrome driver (headless: {self.headless})...")
         chrome_options = Options()
         if self.headless:
@@ -43,19 +134,25 @@ class PumpSeleniumBot:
 
         chrome_options.add_argument("--no-sandbox") # Common for Docker/CI environments
         chrome_options.add_argument("--disable-dev-shm-usage") # Common for Docker/CI environments
+        # DevTools network/page events are read back from the performance log to confirm launches
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
         
         service = Service(executable_path=self.chromedriver_path)
         try:
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            driver = webdriver.Chrome(service=service, options=chrome_options)
             logger.info("Chrome driver initialized successfully.")
+            return driver
         except Exception as e:
             logger.error(f"Failed to initialize Chrome driver: {e}")
             raise
 
+    def _initialize_driver(self):
+        # The watchdog hands back the current driver, or a fresh one if it crashed or was due for recycling
+        self.driver = self.watchdog.acquire()
+
     def connect_wallet_and_login(self):
         """Navigates to Pump.fun, logs in, and connects the wallet."""
-        if not self.driver:
-            self._initialize_driver()
+        self._initialize_driver()
         
         try:
             logger.info(f"Navigating to {PUMP_FUN_URL}")
@@ -147,13 +244,16 @@ class PumpSeleniumBot:
         tweet_url: str,
         initial_buy_sol: float,
         token_telegram_link: str | None = None,
-        token_website_link: str | None = None
-    ) -> str | None:
-        """Creates a new token on Pump.fun."""
+        token_website_link: str | None = None,
+        confirmation_timeout: float = 60.0
+    ) -> LaunchResult | None:
+        """Creates a new token on Pump.fun and returns its address and URL once DevTools confirms it."""
         if not self.driver:
             logger.error("Driver not initialized. Call connect_wallet_and_login first.")
             return None
 
+        self.watchdog.record_launch()
+        started_at = time.monotonic()
         try:
             logger.info(f"Starting token creation process for {token_name} ({token_ticker})")
             
@@ -209,7 +309,10 @@ class PumpSeleniumBot:
             # Assuming we are logged in and wallet connected from previous step.
             # The actual button text/selector needs to be verified.
             final_create_button_xpath = "//button[contains(text(), 'Create') or contains(text(), 'Deploy') or contains(text(), 'Launch')]" # Placeholder
-            WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable((By.XPATH, final_create_button_xpath))).click()
+            final_create_button = WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable((By.XPATH, final_create_button_xpath)))
+            self._drain_performance_log() # Only events caused by the click below should count
+            clicked_at = time.monotonic()
+            final_create_button.click()
             logger.info("Clicked final create/deploy button.")
 
             # Handle initial buy (0.05 SOL)
@@ -217,26 +320,24 @@ class PumpSeleniumBot:
             # It might involve confirming a transaction in a wallet pop-up (hard to automate with Selenium alone if it's an extension)
             # or interacting with on-page elements to set buy amount and confirm.
             logger.warning(f"Placeholder for initial buy of {initial_buy_sol} SOL. This step requires careful UI analysis on Pump.fun.")
-            time.sleep(10) # Placeholder for buy interaction and transaction processing
-
-            # Retrieve token address/link
-            # After successful creation, the page should display the token address or a link to its page.
-            # This also needs specific selectors from the live site.
-            token_page_url = self.driver.current_url # Or find a specific link element
-            # Example: token_address_element = WebDriverWait(self.driver, 30).until(EC.presence_of_element_located((By.XPATH, "//div[@class='token-address']")))
-            # token_address = token_address_element.text
-            logger.info(f"Token creation process initiated. Current URL: {token_page_url}")
-            # This URL might be the final token page or a transaction pending page.
-            # Need to confirm how to get the *final* token URL or address.
-            
-            # For now, returning the current URL as a placeholder
-            # A more robust way would be to look for a success message and a specific element containing the token address or link.
-            if "pump.fun" in token_page_url and "create" not in token_page_url: # Basic check
-                 logger.info(f"Token successfully created (assumed). Token page URL: {token_page_url}")
-                 return token_page_url
-            else:
-                 logger.error(f"Token creation may have failed or URL not as expected: {token_page_url}")
-                 return None
+
+            confirmation = self._wait_for_launch_confirmation(confirmation_timeout)
+            if not confirmation:
+                logger.error(f"No token creation confirmed within {confirmation_timeout}s. Current URL: {self.driver.current_url}")
+                return None
+
+            token_address, confirmed_via = confirmation
+            confirmed_at = time.monotonic()
+            result = LaunchResult(
+                token_address=token_address,
+                token_url=f"{PUMP_FUN_URL}/coin/{token_address}",
+                confirmed_via=confirmed_via,
+                form_seconds=clicked_at - started_at,
+                confirm_seconds=confirmed_at - clicked_at,
+                total_seconds=confirmed_at - started_at
+            )
+            logger.info(f"Token successfully created via {confirmed_via} in {result.total_seconds:.1f}s (confirmation {result.confirm_seconds:.1f}s): {result.token_url}")
+            return result
 
         except TimeoutException as e:
             logger.error(f"Timeout during token creation: {e}. Elements not found or page did not load.")
@@ -247,11 +348,78 @@ class PumpSeleniumBot:
             # self.driver.save_screenshot("debug_screenshot_error.png")
             return None
 
+    def _drain_performance_log(self):
+        try:
+            self.driver.get_log("performance") # Reading the log also clears it
+        except Exception as e:
+            logger.warning(f"Could not read DevTools performance log: {e}")
+
+    def _wait_for_launch_confirmation(self, timeout: float, poll_interval: float = 0.25) -> tuple[str, str] | None:
+        """Watches DevTools events for the redirect, navigation or create response carrying the new token address.
+
+        Only the create POST sent after the final click counts as a response confirmation. Its response
+        is matched by requestId and its body is read once loading has finished, retrying on later polls.
+        """
+        deadline = time.monotonic() + timeout
+        create_requests = {} # requestId -> URL of create POSTs triggered by the click
+        successful_responses = set() # requestIds of create POSTs that got a 2xx response
+        finished_responses = set() # ...and whose body has finished loading
+        while time.monotonic() < deadline:
+            for entry in self.driver.get_log("performance"):
+                try:
+                    message = json.loads(entry["message"])["message"]
+                except (KeyError, TypeError, ValueError):
+                    continue
+                method = message.get("method")
+                params = message.get("params", {})
+                request_id = params.get("requestId")
+
+                if method == "Network.requestWillBeSent":
+                    if params.get("redirectResponse"):
+                        token_address = _token_address_from_url(params.get("request", {}).get("url"))
+                        if token_address:
+                            return token_address, "redirect"
+                    if _is_create_request(params.get("request", {})):
+                        create_requests[request_id] = params["request"]["url"]
+                        logger.info(f"Create request sent: POST {create_requests[request_id]}")
+                elif method == "Page.frameNavigated" and not params.get("frame", {}).get("parentId"):
+                    token_address = _token_address_from_url(params.get("frame", {}).get("url"))
+                    if token_address:
+                        return token_address, "navigation"
+                elif method == "Network.responseReceived" and request_id in create_requests:
+                    status = params.get("response", {}).get("status", 0)
+                    if 200 <= status < 300:
+                        successful_responses.add(request_id)
+                    else:
+                        logger.error(f"Create request POST {create_requests[request_id]} failed with HTTP {status}.")
+                elif method == "Network.loadingFinished" and request_id in successful_responses:
+                    finished_responses.add(request_id)
+                elif method == "Network.loadingFailed" and request_id in create_requests:
+                    logger.error(f"Create request POST {create_requests[request_id]} failed: {params.get('errorText')}")
+                    successful_responses.discard(request_id)
+
+            for request_id in list(finished_responses):
+                try:
+                    body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+                except Exception as e:
+                    logger.debug(f"Response body for {create_requests[request_id]} not available yet: {e}")
+                    continue # Retried on the next poll
+                finished_responses.discard(request_id)
+                token_address = _token_address_from_body(body)
+                if token_address:
+                    return token_address, "response"
+                logger.warning(f"Create response from {create_requests[request_id]} did not contain a token address.")
+            time.sleep(poll_interval)
+        return None
+
+    def get_metrics(self) -> dict:
+        """Returns driver crash/recycle counters and current browser memory usage."""
+        return self.watchdog.get_metrics()
+
     def close(self):
-        if self.driver:
-            logger.info("Closing Chrome driver.")
-            self.driver.quit()
-            self.driver = None
+        logger.info("Closing Chrome driver.")
+        self.watchdog.shutdown()
+        self.driver = None
 
 # Example Usage (for testing structure - DO NOT RUN WITHOUT EXTREME CAUTION AND DUMMY DATA)
 async def _test_pump_bot():
@@ -291,7 +459,7 @@ async def _test_pump_bot():
         with open(dummy_image_path, "w") as f:
             f.write("dummy image content") # Real image needed for actual upload
 
-        # token_url = bot.create_token(
+        # launch_result = bot.create_token(
         #     token_name="Test Token Name",
         #     token_ticker="TESTT",
         #     description="This is a test token created by the bot.",
@@ -299,8 +467,8 @@ async def _test_pump_bot():
         #     tweet_url="https://twitter.com/user/status/123",
         #     initial_buy_sol=0.01
         # )
-        # if token_url:
-        #     logger.info(f"[TEST] Token created successfully: {token_url}")
+        # if launch_result:
+        #     logger.info(f"[TEST] Token created successfully: {launch_result.token_url} ({launch_result.total_seconds:.1f}s)")
         # else:
         #     logger.error("[TEST] Token creation failed.")
         logger.info("create_token() would be called here after successful login/wallet connection.")
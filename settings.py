@@ -0,0 +1,256 @@
+import os
+import signal
+import asyncio
+import logging
+from dataclasses import dataclass, field, fields
+from dotenv import dotenv_values, find_dotenv
+
+from ai_processor import SUPPORTED_IMAGE_SIZES
+
+logger = logging.getLogger(__name__)
+
+# Used when neither BOT_ENV_FILE is set nor a .env is found above this file, so the reloader still watches a fixed place
+DEFAULT_ENV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+
+# Fields that only take effect when the process starts (credentials, browser binary/profile)
+RESTART_REQUIRED_FIELDS = {
+    "openai_api_key",
+    "pump_fun_username",
+    "pump_fun_password",
+    "solana_private_key",
+    "chrome_profile_dir",
+    "chromedriver_path",
+    "pump_headless",
+    "telegram_bot_token",
+    "run_mode",
+    "process_workers",
+}
+
+RUN_MODES = ("single", "multiprocess")
+
+@dataclass(frozen=True)
+class Settings:
+    # Twitter
+    twitter_usernames: tuple[str, ...]
+    tweet_poll_interval: int
+    # AI
+    openai_api_key: str = field(repr=False)
+    ai_chat_models: tuple[str, ...] = ("gpt-3.5-turbo",)
+    ai_image_sizes: tuple[str, ...] = ("256x256",)
+    ai_summary_budget_s: float = 5.0
+    ai_image_budget_s: float = 20.0
+    # Pump.fun
+    pump_fun_username: str = ""
+    pump_fun_password: str = field(default="", repr=False)
+    solana_private_key: str = field(default="", repr=False)
+    initial_buy_sol: float = 0.05
+    chrome_profile_dir: str | None = None
+    chromedriver_path: str = "chromedriver"
+    pump_headless: bool = True
+    browser_max_launches: int = 20
+    browser_max_rss_mb: int = 1500
+    browser_hot_standby: bool = True
+    launch_confirm_timeout: float = 60.0
+    # Telegram
+    telegram_bot_token: str = field(default="", repr=False)
+    telegram_chat_ids: tuple[str, ...] = ()
+    # Optional links for token creation
+    token_telegram_link: str | None = None
+    token_website_link: str | None = None
+    # Process layout
+    run_mode: str = "single"
+    process_workers: int = 2
+    # Diagnostics
+    loop_lag_threshold_ms: int = 100
+    profile_dir: str = "profiles"
+    profile_duration_s: float = 30.0
+
+    def __post_init__(self):
+        if not self.twitter_usernames:
+            raise ValueError("TWITTER_USERNAMES must list at least one username.")
+        if not self.telegram_chat_ids:
+            raise ValueError("TELEGRAM_CHAT_IDS must list at least one chat ID.")
+        missing = [name for name in ("openai_api_key", "pump_fun_username", "pump_fun_password", "solana_private_key", "telegram_bot_token") if not getattr(self, name)]
+        if missing:
+            raise ValueError(f"Missing required settings: {', '.join(name.upper() for name in missing)}")
+        if self.tweet_poll_interval < 1:
+            raise ValueError("TWEET_POLL_INTERVAL must be at least 1 second.")
+        if self.initial_buy_sol < 0:
+            raise ValueError("INITIAL_BUY_SOL cannot be negative.")
+        if self.browser_max_launches < 1 or self.browser_max_rss_mb < 1:
+            raise ValueError("BROWSER_MAX_LAUNCHES and BROWSER_MAX_RSS_MB must be positive.")
+        if self.launch_confirm_timeout <= 0:
+            raise ValueError("LAUNCH_CONFIRM_TIMEOUT must be positive.")
+        if not self.ai_chat_models or not self.ai_image_sizes:
+            raise ValueError("AI_CHAT_MODELS and AI_IMAGE_SIZES must list at least one entry.")
+        unsupported = [size for size in self.ai_image_sizes if size not in SUPPORTED_IMAGE_SIZES]
+        if unsupported:
+            raise ValueError(f"AI_IMAGE_SIZES contains unsupported sizes {unsupported}. Supported: {', '.join(SUPPORTED_IMAGE_SIZES)}")
+        if self.ai_summary_budget_s <= 0 or self.ai_image_budget_s <= 0:
+            raise ValueError("AI_SUMMARY_BUDGET_S and AI_IMAGE_BUDGET_S must be positive.")
+        if self.run_mode not in RUN_MODES:
+            raise ValueError(f"RUN_MODE must be one of {', '.join(RUN_MODES)}, got '{self.run_mode}'.")
+        if self.process_workers < 1:
+            raise ValueError("PROCESS_WORKERS must be at least 1.")
+        if self.loop_lag_threshold_ms < 1 or self.profile_duration_s <= 0:
+            raise ValueError("LOOP_LAG_THRESHOLD_MS and PROFILE_DURATION_S must be positive.")
+
+    def changed_fields(self, other: "Settings") -> set[str]:
+        """Returns the names of the fields whose values differ between the two settings objects."""
+        return {f.name for f in fields(self) if getattr(self, f.name) != getattr(other, f.name)}
+
+def default_env_path() -> str:
+    """Returns BOT_ENV_FILE if set, else the nearest .env at or above the bot's directory, like load_dotenv()."""
+    return os.getenv("BOT_ENV_FILE") or find_dotenv() or DEFAULT_ENV_PATH
+
+def _parse_list(value: str | None) -> tuple[str, ...]:
+    return tuple(item.strip() for item in (value or "").split(",") if item.strip())
+
+def _parse_bool(name: str, value: str | None, default: bool) -> bool:
+    if value is None or value.strip() == "":
+        return default
+    normalized = value.strip().lower()
+    if normalized not in ("true", "false"):
+        raise ValueError(f"{name} must be 'true' or 'false', got '{value}'.")
+    return normalized == "true"
+
+def _parse_number(name: str, value: str | None, default, cast):
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        kind = "an integer" if cast is int else "a number"
+        raise ValueError(f"{name} must be {kind}, got '{value}'.") from None
+
+def load_settings(env_path: str | None = None) -> Settings:
+    """Builds validated settings from the process environment overlaid with the .env file.
+
+    Values in the .env file win over the process environment so that edits to the
+    file are picked up on reload. Raises ValueError if any value is missing or invalid.
+    """
+    env_path = env_path or default_env_path()
+    file_values = dotenv_values(env_path) if os.path.exists(env_path) else {}
+    env = {**os.environ, **{key: value for key, value in file_values.items() if value is not None}}
+
+    return Settings(
+        twitter_usernames=_parse_list(env.get("TWITTER_USERNAMES")),
+        tweet_poll_interval=_parse_number("TWEET_POLL_INTERVAL", env.get("TWEET_POLL_INTERVAL"), 60, int),
+        openai_api_key=env.get("OPENAI_API_KEY", ""),
+        ai_chat_models=_parse_list(env.get("AI_CHAT_MODELS")) or ("gpt-3.5-turbo",),
+        ai_image_sizes=_parse_list(env.get("AI_IMAGE_SIZES")) or ("256x256",),
+        ai_summary_budget_s=_parse_number("AI_SUMMARY_BUDGET_S", env.get("AI_SUMMARY_BUDGET_S"), 5.0, float),
+        ai_image_budget_s=_parse_number("AI_IMAGE_BUDGET_S", env.get("AI_IMAGE_BUDGET_S"), 20.0, float),
+        pump_fun_username=env.get("PUMP_FUN_USERNAME", ""),
+        pump_fun_password=env.get("PUMP_FUN_PASSWORD", ""),
+        solana_private_key=env.get("SOLANA_PRIVATE_KEY", ""),
+        initial_buy_sol=_parse_number("INITIAL_BUY_SOL", env.get("INITIAL_BUY_SOL"), 0.05, float),
+        chrome_profile_dir=env.get("CHROME_PROFILE_DIR") or None,
+        chromedriver_path=env.get("CHROMEDRIVER_PATH") or "chromedriver",
+        pump_headless=_parse_bool("PUMP_HEADLESS", env.get("PUMP_HEADLESS"), True),
+        browser_max_launches=_parse_number("BROWSER_MAX_LAUNCHES", env.get("BROWSER_MAX_LAUNCHES"), 20, int),
+        browser_max_rss_mb=_parse_number("BROWSER_MAX_RSS_MB", env.get("BROWSER_MAX_RSS_MB"), 1500, int),
+        browser_hot_standby=_parse_bool("BROWSER_HOT_STANDBY", env.get("BROWSER_HOT_STANDBY"), True),
+        launch_confirm_timeout=_parse_number("LAUNCH_CONFIRM_TIMEOUT", env.get("LAUNCH_CONFIRM_TIMEOUT"), 60.0, float),
+        telegram_bot_token=env.get("TELEGRAM_BOT_TOKEN", ""),
+        telegram_chat_ids=_parse_list(env.get("TELEGRAM_CHAT_IDS")),
+        token_telegram_link=env.get("TOKEN_TELEGRAM_LINK") or None,
+        token_website_link=env.get("TOKEN_WEBSITE_LINK") or None,
+        run_mode=(env.get("RUN_MODE") or "single").strip().lower(),
+        process_workers=_parse_number("PROCESS_WORKERS", env.get("PROCESS_WORKERS"), 2, int),
+        loop_lag_threshold_ms=_parse_number("LOOP_LAG_THRESHOLD_MS", env.get("LOOP_LAG_THRESHOLD_MS"), 100, int),
+        profile_dir=env.get("PROFILE_DIR") or "profiles",
+        profile_duration_s=_parse_number("PROFILE_DURATION_S", env.get("PROFILE_DURATION_S"), 30.0, float),
+    )
+
+class SettingsReloader:
+    """Reloads settings on SIGHUP or when the .env file changes and hands the changes to a callback.
+
+    `on_change(old, new, changed)` is called with the previous settings, the new settings and
+    the set of changed field names, and returns the names of any fields it failed to apply.
+    Only fields that were applied are committed to `current`; invalid files keep the current settings.
+    """
+
+    def __init__(self, current: Settings, on_change, env_path: str | None = None, check_interval: float = 5.0):
+        self.current = current
+        self.on_change = on_change
+        self.env_path = env_path or default_env_path()
+        self.check_interval = check_interval
+        self._reload_requested = asyncio.Event()
+        self._last_mtime = self._file_mtime()
+        self._task = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self.request_reload)
+        except (NotImplementedError, AttributeError, RuntimeError):
+            logger.warning("SIGHUP reload is not supported on this platform; relying on file change detection only.")
+        self._task = loop.create_task(self._run())
+        logger.info(f"Watching {self.env_path} for configuration changes (send SIGHUP to reload immediately).")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def request_reload(self):
+        logger.info("Configuration reload requested.")
+        self._reload_requested.set()
+
+    def reload(self) -> bool:
+        """Loads the settings again and applies them. Returns True if anything changed."""
+        try:
+            new = load_settings(self.env_path)
+        except ValueError as e:
+            logger.error(f"Ignoring invalid configuration, keeping current settings: {e}")
+            return False
+
+        changed = self.current.changed_fields(new)
+        if not changed:
+            logger.info("Configuration reloaded, no changes.")
+            return False
+
+        needs_restart = changed & RESTART_REQUIRED_FIELDS
+        if needs_restart:
+            logger.warning(f"These settings only apply after a restart and were not changed: {', '.join(sorted(needs_restart))}")
+        # Keep running with the old values for fields that cannot be applied live
+        new = Settings(**{f.name: getattr(self.current if f.name in needs_restart else new, f.name) for f in fields(new)})
+        applied = changed - needs_restart
+        if not applied:
+            return False
+
+        old = self.current
+        logger.info(f"Applying configuration changes: {', '.join(sorted(applied))}")
+        try:
+            failed = set(self.on_change(old, new, applied) or ())
+        except Exception as e:
+            logger.error(f"Error applying configuration changes: {e}", exc_info=True)
+            failed = applied
+        if failed:
+            logger.error(f"Keeping previous values for settings that could not be applied: {', '.join(sorted(failed))}")
+            new = Settings(**{f.name: getattr(old if f.name in failed else new, f.name) for f in fields(new)})
+        self.current = new
+        return bool(applied - failed)
+
+    def _file_mtime(self) -> float | None:
+        try:
+            return os.stat(self.env_path).st_mtime
+        except OSError:
+            return None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._reload_requested.wait(), timeout=self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+            mtime = self._file_mtime()
+            if self._reload_requested.is_set() or mtime != self._last_mtime:
+                self._reload_requested.clear()
+                self._last_mtime = mtime
+                self.reload()
@@ -19,6 +19,14 @@ class TelegramNotifier:
         self.base_url = f"https://api.telegram.org/bot{self.bot_token}/"
         logger.info(f"TelegramNotifier initialized for {len(self.chat_ids)} chat(s).")
 
+    def update_chat_ids(self, chat_ids: list[str]):
+        """Replaces the notification targets; takes effect from the next message."""
+        chat_ids = [chat_id.strip() for chat_id in chat_ids if chat_id.strip()]
+        if not chat_ids:
+            raise ValueError("No valid Telegram chat IDs provided.")
+        self.chat_ids = chat_ids
+        logger.info(f"TelegramNotifier now targets {len(self.chat_ids)} chat(s).")
+
     async def send_message(
         self,
         ticker: str,
@@ -44,7 +52,7 @@ class TelegramNotifier:
         send_url = self.base_url + "sendMessage"
         all_sent_successfully = True
 
-        for chat_id in self.chat_ids:
+        for chat_id in list(self.chat_ids):
             payload = {
                 "chat_id": chat_id,
                 "text": text,
@@ -16,6 +16,7 @@ class TwitterWatcher:
         self.poll_interval = poll_interval
         self.seen_tweet_ids = {username: set() for username in self.usernames}
         self.last_check_time = {username: datetime.now(timezone.utc) for username in self.usernames}
+        self._initialized_usernames = set()
 
         # Initialize seen_tweet_ids with recent tweets to avoid processing old ones on first run
         # For simplicity, we'll fetch a few recent tweets for each user and mark them as seen.
@@ -41,16 +42,34 @@ class TwitterWatcher:
             self.last_check_time[username] = datetime.now(timezone.utc)
         except Exception as e:
             logger.error(f"Error initializing seen tweets for @{username}: {e}")
+        self._initialized_usernames.add(username)
+
+    def update_usernames(self, usernames: list[str]):
+        """Changes the watched accounts without losing the seen tweets of accounts that stay watched."""
+        usernames = [name.strip() for name in usernames if name.strip()]
+        if not usernames:
+            raise ValueError("No valid Twitter usernames provided.")
+        added = [name for name in usernames if name not in self.usernames]
+        removed = [name for name in self.usernames if name not in usernames]
+        for username in added:
+            self.seen_tweet_ids.setdefault(username, set())
+            # Only tweets posted from now on count, so tweets from while an account was unwatched are not replayed
+            self.last_check_time[username] = datetime.now(timezone.utc)
+        self.usernames = usernames
+        logger.info(f"Watched Twitter users updated. Added: {added or 'none'}, removed: {removed or 'none'}")
 
     async def watch(self):
         """Asynchronously yields new tweets from the specified users."""
-        # Initialize all users first
-        for username in self.usernames:
-            if not self.seen_tweet_ids[username]: # only if not already initialized
-                 await self._initialize_seen_tweets(username)
-
         while True:
-            for username in self.usernames:
+            # Initialize users that are new, either at startup or after a configuration reload
+            for username in list(self.usernames):
+                if username not in self._initialized_usernames and not self.seen_tweet_ids[username]:
+                    await self._initialize_seen_tweets(username)
+
+            # Iterate over a snapshot; the list may be replaced by a reload while a tweet is being processed
+            for username in list(self.usernames):
+                if username not in self.usernames:
+                    continue # Dropped by a reload during this cycle
                 logger.info(f"Checking for new tweets from @{username} since {self.last_check_time[username].isoformat()}...")
                 new_tweets_for_user = []
                 try: